@@ -12,6 +12,7 @@ from telegram.ext import (
 from config.settings import Settings
 from core.redis_queue import queue
 from core.title_processor import title_processor
+from core.job_profiler import profiler
 
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
@@ -122,15 +123,72 @@ async def clear_queue(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text("🗑 Queue cleared!")
 
 
+# -------------------------------------------------------
+# SLOWEST RECENT JOBS (worker profiling)
+# -------------------------------------------------------
+async def slow_jobs(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    /slowjobs [count]   (count: 1-20, default 10)
+    Needs PROFILE_ENABLED=1 on the worker.
+    """
+    if update.effective_user.id != Settings.OWNER_ID:
+        return
+
+    try:
+        limit = int(context.args[0]) if context.args else 10
+    except ValueError:
+        return await update.message.reply_text("Usage:\n/slowjobs [count]")
+
+    limit = max(1, min(limit, 20))
+
+    jobs = profiler.slowest(limit)
+    if not jobs:
+        return await update.message.reply_text("No job stats yet (PROFILE_ENABLED=1 on worker?)")
+
+    lines = ["🐢 Slowest recent jobs:\n"]
+    for s in jobs:
+        steps = ", ".join(
+            f"{st['step']} {st['wall']:.1f}s"
+            + (f" (ffmpeg cpu {st['child_cpu']:.1f}s)" if st.get("child_cpu") else "")
+            for st in s["steps"]
+        )
+        flags = " ❌" if s["failed"] else ""
+        flags += " 📊" if s["sampled"] else ""
+        # Worker process only; older entries / non-Linux workers only have the lifetime peak
+        rss_label = "worker rss" if s.get("peak_rss_scope") == "job" else "worker peak rss (lifetime)"
+        child_rss = s.get("children_peak_rss_kb")
+        child_rss_text = f", ffmpeg max rss {child_rss // 1024}MB (lifetime)" if child_rss else ""
+        lines.append(
+            f"{s['wall']:.1f}s (cpu {s['cpu']:.1f}s + ffmpeg {s.get('child_cpu', 0):.1f}s, "
+            f"{rss_label} {s['peak_rss_kb'] // 1024}MB{child_rss_text}){flags}\n"
+            f"  {s['title']}\n"
+            f"  {steps}"
+        )
+
+    # Telegram rejects messages over 4096 chars
+    text = "\n".join(lines)
+    if len(text) > 4096:
+        text = text[:4093] + "..."
+
+    await update.message.reply_text(text)
+
+
 # -------------------------------------------------------
 # BOT APPLICATION
 # -------------------------------------------------------
 def main():
-    app = ApplicationBuilder().token(Settings.TELEGRAM_BOT_TOKEN).build()
+    app = (
+        ApplicationBuilder()
+        .token(Settings.TELEGRAM_BOT_TOKEN)
+        .base_url(Settings.TELEGRAM_BASE_URL)
+        .base_file_url(Settings.TELEGRAM_BASE_FILE_URL)
+        .build()
+    )
 
     app.add_handler(CommandHandler("start", start))
     app.add_handler(CommandHandler("setgroup", set_target))
     app.add_handler(CommandHandler("clear_queue", clear_queue))
+    app.add_handler(CommandHandler("slowjobs", slow_jobs))
 
     app.add_handler(
         MessageHandler(
@@ -10,8 +10,15 @@ class Settings:
     # TELEGRAM
     # ---------------------------------------------------
     BOT_TOKEN = os.getenv("BOT_TOKEN")  # Telegram Bot Token
+    TELEGRAM_BOT_TOKEN = BOT_TOKEN  # Name used by bot/main.py and worker/worker.py
     OWNER_ID = int(os.getenv("OWNER_ID", "0"))  # Your Telegram User ID
 
+    # Bot API server. Override to point bot + worker at a local
+    # server (e.g. loadtest/fake_telegram.py): http://127.0.0.1:8081
+    TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org").rstrip("/")
+    TELEGRAM_BASE_URL = f"{TELEGRAM_API_URL}/bot"
+    TELEGRAM_BASE_FILE_URL = f"{TELEGRAM_API_URL}/file/bot"
+
     # ---------------------------------------------------
     # REDIS (Render Free Redis)
     # ---------------------------------------------------
@@ -33,6 +40,20 @@ class Settings:
     VIDEO_DIR = f"{BASE_DIR}/videos"
     THUMB_DIR = f"{BASE_DIR}/thumbs"
 
+    # ---------------------------------------------------
+    # JOB PROFILING (opt-in, worker only)
+    # PROFILE_SAMPLE_EVERY=N -> cProfile + tracemalloc for 1 job in N (0 = never)
+    # PROFILE_SLOW_SECONDS  -> also dump jobs slower than this (timings only,
+    #                          unless the job was profiled)
+    # PROFILE_EVERY_JOB=1   -> profile every job, keep dumps only for sampled/slow
+    # ---------------------------------------------------
+    PROFILE_ENABLED = os.getenv("PROFILE_ENABLED", "0") == "1"
+    PROFILE_SAMPLE_EVERY = int(os.getenv("PROFILE_SAMPLE_EVERY", "20"))
+    PROFILE_SLOW_SECONDS = float(os.getenv("PROFILE_SLOW_SECONDS", "60"))
+    PROFILE_EVERY_JOB = os.getenv("PROFILE_EVERY_JOB", "0") == "1"
+    PROFILE_DIR = f"{BASE_DIR}/profiles"
+    PROFILE_MAX_DUMPS = int(os.getenv("PROFILE_MAX_DUMPS", "20"))
+
     @staticmethod
     def ensure_folders():
         """Create necessary temp folders on start."""
@@ -0,0 +1,277 @@
+import os
+import json
+import time
+import random
+import logging
+import cProfile
+import resource
+import tracemalloc
+from contextlib import contextmanager
+
+import redis
+from config.settings import Settings
+
+CLEAR_REFS = "/proc/self/clear_refs"
+PROC_STATUS = "/proc/self/status"
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset the kernel's RSS high-water mark (VmHWM) so it covers only
+    what runs next. Linux only; returns False where unsupported.
+    """
+    try:
+        with open(CLEAR_REFS, "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def read_peak_rss_kb():
+    """VmHWM from /proc/self/status in KB, or None if unavailable."""
+    try:
+        with open(PROC_STATUS) as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def cpu_times():
+    """
+    (worker CPU, children CPU) in seconds.
+    Children = finished subprocesses such as ffmpeg, which the worker's own
+    process_time() never sees.
+    """
+    t = os.times()
+    return t.user + t.system, t.children_user + t.children_system
+
+
+class JobRun:
+    """
+    Timing record for a single job.
+    Collects per-step wall time and CPU time (worker + child processes);
+    optionally owns a cProfile profiler and a tracemalloc session
+    (profiled jobs only).
+    """
+
+    def __init__(self, job_id: str, title: str, sampled: bool, profiled: bool):
+        self.job_id = job_id
+        self.title = title
+        self.sampled = sampled
+        self.profiled = profiled
+        self.steps = []
+        self.failed = False
+
+        # Set by JobProfiler.job() once VmHWM was reset for this job
+        self.rss_per_job = False
+
+        self.profile = cProfile.Profile() if profiled else None
+        self.snapshot = None
+        self.traced_peak = None
+
+        self.started_at = time.time()
+        self.wall_start = time.perf_counter()
+        self.cpu_start, self.child_cpu_start = cpu_times()
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.child_cpu = 0.0
+
+    @contextmanager
+    def step(self, name: str):
+        """Time one step of the job (wall, worker CPU and child CPU seconds)."""
+        wall = time.perf_counter()
+        cpu, child_cpu = cpu_times()
+        try:
+            yield
+        finally:
+            cpu_end, child_cpu_end = cpu_times()
+            self.steps.append({
+                "step": name,
+                "wall": round(time.perf_counter() - wall, 4),
+                "cpu": round(cpu_end - cpu, 4),
+                "child_cpu": round(child_cpu_end - child_cpu, 4),
+            })
+
+    def peak_rss(self):
+        """
+        (worker peak RSS in KB, 'job' | 'process').
+        Worker process only; child processes are in children_peak_rss_kb.
+        """
+        if self.rss_per_job:
+            peak = read_peak_rss_kb()
+            if peak is not None:
+                return peak, "job"
+        # ru_maxrss is in KB on Linux and covers the whole process lifetime
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, "process"
+
+    def summary(self) -> dict:
+        peak_rss_kb, peak_rss_scope = self.peak_rss()
+        return {
+            "job_id": self.job_id,
+            "title": self.title,
+            "started_at": self.started_at,
+            "wall": round(self.wall, 4),
+            "cpu": round(self.cpu, 4),
+            "child_cpu": round(self.child_cpu, 4),
+            # Worker process only (ffmpeg runs in a child process)
+            "peak_rss_kb": peak_rss_kb,
+            "peak_rss_scope": peak_rss_scope,
+            # Largest RSS of any finished child so far (lifetime max; can't be reset per job)
+            "children_peak_rss_kb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+            "traced_peak_kb": self.traced_peak // 1024 if self.traced_peak else None,
+            "sampled": self.sampled,
+            "failed": self.failed,
+            "steps": self.steps,
+        }
+
+
+class JobProfiler:
+    """
+    Opt-in profiling hooks for the worker.
+    - every job gets per-step wall/CPU timings (logged); CPU is split into
+      the worker's own time and child processes (ffmpeg)
+    - 1 job in PROFILE_SAMPLE_EVERY runs under cProfile + tracemalloc
+    - sampled jobs and jobs slower than PROFILE_SLOW_SECONDS are dumped
+      to PROFILE_DIR (oldest dumps removed past PROFILE_MAX_DUMPS)
+    - slow jobs only carry cProfile/tracemalloc data if they were profiled:
+      set PROFILE_EVERY_JOB=1 to profile every job and keep the dump only
+      when the job was sampled or slow (adds profiler overhead to all jobs)
+    - job summaries are kept in Redis so the bot can list the slowest ones
+    """
+
+    def __init__(self, stats_key="bot_job_stats", max_stats=200):
+        self.enabled = Settings.PROFILE_ENABLED
+        self.sample_every = Settings.PROFILE_SAMPLE_EVERY
+        self.every_job = Settings.PROFILE_EVERY_JOB
+        self.slow_seconds = Settings.PROFILE_SLOW_SECONDS
+        self.dump_dir = Settings.PROFILE_DIR
+        self.max_dumps = Settings.PROFILE_MAX_DUMPS
+
+        self.stats_key = stats_key
+        self.max_stats = max_stats
+        self.redis = redis.Redis.from_url(Settings.REDIS_URL, decode_responses=True)
+
+    def should_sample(self) -> bool:
+        if not self.enabled or self.sample_every <= 0:
+            return False
+        return random.randrange(self.sample_every) == 0
+
+    # ----------------------------------------------------------
+    # PER-JOB HOOK
+    # ----------------------------------------------------------
+    @contextmanager
+    def job(self, job: dict):
+        """
+        Wrap a whole job:
+
+            with profiler.job(job) as run:
+                with run.step("download"):
+                    ...
+        """
+        job_id = os.path.splitext(job.get("safe_filename") or "job")[0]
+        sampled = self.should_sample()
+        profiled = self.enabled and (sampled or self.every_job)
+        run = JobRun(job_id, job.get("title", ""), sampled, profiled)
+        run.rss_per_job = self.enabled and reset_peak_rss()
+
+        if run.profiled:
+            tracemalloc.start()
+            run.profile.enable()
+
+        try:
+            yield run
+        except Exception:
+            run.failed = True
+            raise
+        finally:
+            if run.profiled:
+                run.profile.disable()
+                run.traced_peak = tracemalloc.get_traced_memory()[1]
+                run.snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+
+            run.wall = time.perf_counter() - run.wall_start
+            cpu, child_cpu = cpu_times()
+            run.cpu = cpu - run.cpu_start
+            run.child_cpu = child_cpu - run.child_cpu_start
+            self.finish(run)
+
+    def finish(self, run: JobRun):
+        steps = ", ".join(f"{s['step']}={s['wall']:.2f}s" for s in run.steps)
+        logging.info(
+            f"Job timings: total={run.wall:.2f}s cpu={run.cpu:.2f}s "
+            f"child_cpu={run.child_cpu:.2f}s [{steps}]"
+        )
+
+        if not self.enabled:
+            return
+
+        # Profiling must never break a job
+        try:
+            summary = run.summary()
+            if run.sampled or (self.slow_seconds > 0 and run.wall >= self.slow_seconds):
+                self.dump(run, summary)
+            self.record(summary)
+        except Exception as e:
+            logging.error(f"Profiler error: {e}")
+
+    # ----------------------------------------------------------
+    # DUMPS (bounded directory)
+    # ----------------------------------------------------------
+    def dump(self, run: JobRun, summary: dict):
+        os.makedirs(self.dump_dir, exist_ok=True)
+        base = os.path.join(self.dump_dir, f"{int(run.started_at)}_{run.job_id}")
+
+        with open(f"{base}.json", "w") as f:
+            json.dump(summary, f, indent=2)
+
+        if run.profile:
+            run.profile.dump_stats(f"{base}.prof")
+
+        if run.snapshot:
+            with open(f"{base}.tracemalloc.txt", "w") as f:
+                for stat in run.snapshot.statistics("lineno")[:25]:
+                    f.write(f"{stat}\n")
+
+        logging.info(f"Profile dumped: {base}.*")
+        self.prune()
+
+    def prune(self):
+        """Keep only the newest max_dumps jobs in dump_dir."""
+        jobs = {}
+        for name in os.listdir(self.dump_dir):
+            path = os.path.join(self.dump_dir, name)
+            jobs.setdefault(name.split(".")[0], []).append(path)
+
+        newest_first = sorted(
+            jobs.values(),
+            key=lambda paths: max(os.path.getmtime(p) for p in paths),
+            reverse=True,
+        )
+        for paths in newest_first[self.max_dumps:]:
+            for p in paths:
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+
+    # ----------------------------------------------------------
+    # RECENT JOB STATS (shared with the bot via Redis)
+    # ----------------------------------------------------------
+    def record(self, summary: dict):
+        self.redis.lpush(self.stats_key, json.dumps(summary))
+        self.redis.ltrim(self.stats_key, 0, self.max_stats - 1)
+
+    def slowest(self, limit=10):
+        """Return the slowest recent job summaries, slowest first."""
+        items = [json.loads(i) for i in self.redis.lrange(self.stats_key, 0, -1)]
+        items.sort(key=lambda s: s["wall"], reverse=True)
+        return items[:limit]
+
+
+# Global instance
+profiler = JobProfiler()
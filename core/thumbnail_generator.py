@@ -1,8 +1,9 @@
-from PIL import Image, ImageDraw, ImageFont
-import textwrap
+from PIL import Image, ImageDraw
 import random
 import os
 
+from core.title_layout import layout_engine, load_font
+
 class ThumbnailGenerator:
     def __init__(self):
         # Folder to save thumbnails
@@ -31,32 +32,11 @@ class ThumbnailGenerator:
 
         return img
 
-    def wrap_text(self, text, font, max_width):
-        """
-        Wrap text to fit thumbnail width
-        """
-        lines = []
-        words = text.split()
-
-        current_line = ""
-        for word in words:
-            test_line = current_line + " " + word if current_line else word
-            if font.getlength(test_line) <= max_width:
-                current_line = test_line
-            else:
-                lines.append(current_line)
-                current_line = word
-
-        if current_line:
-            lines.append(current_line)
-
-        return lines
-
     def generate_thumbnail(self, title: str, filename: str):
         """
         Full process:
         - Gradient background
-        - Big title text centered
+        - Title auto-fitted (largest font that fits) and centered
         - Image saved in thumbnails/
         """
 
@@ -67,23 +47,22 @@ class ThumbnailGenerator:
         img = self.create_gradient_background(width, height)
         draw = ImageDraw.Draw(img)
 
-        # Main title font
-        font = ImageFont.truetype(self.font_path, 72)
-
-        # Text margins
+        # Text box (margins + room for the shadow offset)
         max_width = width - 200
+        max_height = height - 120
 
-        # Wrapped lines
-        lines = self.wrap_text(title, font, max_width)
+        # Memoized layout: font size + wrapped lines that fit the box
+        layout = layout_engine.layout(title, self.font_path, max_width, max_height)
+        font = load_font(self.font_path, layout.font_size)
+        line_height = layout.line_height
 
-        total_text_height = len(lines) * 85
+        total_text_height = len(layout.lines) * line_height
         start_y = (height - total_text_height) // 2
 
         # Draw lines
-        for i, line in enumerate(lines):
-            line_width = font.getlength(line)
+        for i, (line, line_width) in enumerate(zip(layout.lines, layout.line_widths)):
             x = (width - line_width) // 2
-            y = start_y + i * 85
+            y = start_y + i * line_height
 
             # Shadow
             draw.text((x+4, y+4), line, fill="black", font=font)
@@ -0,0 +1,184 @@
+from collections import namedtuple
+from functools import lru_cache
+
+from PIL import ImageFont
+
+# Result of a layout pass. Immutable so it is safe to hand out from the cache.
+TitleLayout = namedtuple("TitleLayout", ["font_size", "line_height", "lines", "line_widths"])
+
+
+@lru_cache(maxsize=128)
+def load_font(font_path: str, size: int):
+    """
+    Load a TrueType font once per (path, size).
+    Pillow re-parses the font file on every truetype() call otherwise.
+    maxsize must cover the whole size search range (28..96 -> 69 sizes by default).
+    """
+    return ImageFont.truetype(font_path, size)
+
+
+class TitleLayoutEngine:
+    """
+    Fits a title inside a text box:
+    - measures every word once and sums the widths (no re-measuring of the growing line)
+    - greedy word wrap using those widths
+    - binary-searches the largest font size whose wrapped lines fit the box
+    Layouts are memoized per (title, font, box).
+    """
+
+    def __init__(self, min_size=28, max_size=96, line_spacing=1.18, cache_size=256):
+        # Font size bounds (px) for the search (keep load_font's cache >= the range)
+        self.min_size = min_size
+        self.max_size = max_size
+
+        # Line height as a multiple of font size (72px font -> 85px line)
+        self.line_spacing = line_spacing
+
+        self.layout = lru_cache(maxsize=cache_size)(self._layout)
+
+    def measure_words(self, words, font):
+        """
+        Return (word_widths, space_width) for a font.
+        Each word is measured exactly once.
+        """
+        return [font.getlength(w) for w in words], font.getlength(" ")
+
+    def wrap_words(self, words, widths, space_width, max_width):
+        """
+        Greedy wrap using pre-measured widths.
+        Returns a list of (line_text, line_width).
+        A single word wider than max_width gets its own (overflowing) line.
+        """
+        lines = []
+        current = []
+        current_width = 0.0
+
+        for word, w in zip(words, widths):
+            if not current:
+                current, current_width = [word], w
+                continue
+
+            test_width = current_width + space_width + w
+            if test_width <= max_width:
+                current.append(word)
+                current_width = test_width
+            else:
+                lines.append((" ".join(current), current_width))
+                current, current_width = [word], w
+
+        if current:
+            lines.append((" ".join(current), current_width))
+
+        return lines
+
+    def split_long_word(self, word, font, max_width):
+        """
+        Break a word wider than max_width into pieces that fit
+        (character level; each character is measured once).
+        """
+        pieces = []
+        current, current_width = "", 0.0
+        for ch in word:
+            w = font.getlength(ch)
+            if current and current_width + w > max_width:
+                pieces.append(current)
+                current, current_width = "", 0.0
+            current += ch
+            current_width += w
+        if current:
+            pieces.append(current)
+        return pieces
+
+    def ellipsize(self, text, font, max_width):
+        """
+        Longest prefix of text such that 'prefix...' fits max_width
+        (each character is measured once, widths are summed).
+        """
+        budget = max_width - font.getlength("...")
+        width, cut = 0.0, 0
+        for ch in text:
+            width += font.getlength(ch)
+            if width > budget:
+                break
+            cut += 1
+        return text[:cut].rstrip() + "..."
+
+    def _force_fit(self, words, font_path, size, max_width, max_height):
+        """
+        Last resort at min_size: break over-wide words, then drop lines that
+        don't fit the height and end the last kept line with an ellipsis.
+        """
+        font = load_font(font_path, size)
+
+        widths, space_width = self.measure_words(words, font)
+        pieces = []
+        for word, w in zip(words, widths):
+            if w > max_width:
+                pieces.extend(self.split_long_word(word, font, max_width))
+            else:
+                pieces.append(word)
+
+        widths, space_width = self.measure_words(pieces, font)
+        lines = self.wrap_words(pieces, widths, space_width, max_width)
+
+        max_lines = max(1, max_height // self.line_height(size))
+        if len(lines) > max_lines:
+            lines = lines[:max_lines]
+            last = self.ellipsize(lines[-1][0], font, max_width)
+            lines[-1] = (last, font.getlength(last))
+
+        return lines
+
+    def line_height(self, size):
+        return int(round(size * self.line_spacing))
+
+    def _try_size(self, words, font_path, size, max_width, max_height):
+        """
+        Wrap words at a given size.
+        Returns (fits, wrapped_lines).
+        """
+        font = load_font(font_path, size)
+        widths, space_width = self.measure_words(words, font)
+        lines = self.wrap_words(words, widths, space_width, max_width)
+
+        fits = (
+            len(lines) * self.line_height(size) <= max_height
+            and all(w <= max_width for _, w in lines)
+        )
+        return fits, lines
+
+    def _layout(self, title: str, font_path: str, max_width: int, max_height: int):
+        """
+        Find the largest font size in [min_size, max_size] that fits the box.
+        If nothing fits, min_size is used with long words broken and
+        the text ellipsized, so the result always stays inside the box.
+        Use self.layout(...) (memoized) rather than calling this directly.
+        """
+        words = title.split() or ["Untitled"]
+
+        best_size = self.min_size
+        best_lines = None
+
+        lo, hi = self.min_size, self.max_size
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            fits, lines = self._try_size(words, font_path, mid, max_width, max_height)
+            if fits:
+                best_size, best_lines = mid, lines
+                lo = mid + 1
+            else:
+                hi = mid - 1
+
+        if best_lines is None:
+            best_lines = self._force_fit(words, font_path, best_size, max_width, max_height)
+
+        return TitleLayout(
+            font_size=best_size,
+            line_height=self.line_height(best_size),
+            lines=tuple(text for text, _ in best_lines),
+            line_widths=tuple(w for _, w in best_lines),
+        )
+
+
+# Global instance
+layout_engine = TitleLayoutEngine()
@@ -0,0 +1,442 @@
+import os
+import re
+import json
+import time
+import random
+import shutil
+import struct
+import logging
+import tempfile
+import threading
+from urllib.parse import parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import ffmpeg
+
+
+# Load-test job ids travel inside the caption ("🎬 Load test lt000042")
+JOB_ID_RE = re.compile(r"\blt\d+\b")
+
+CHUNK = 64 * 1024
+
+# Length of the generated test clips; bitrate is derived from the target size
+CLIP_SECONDS = 10
+
+
+def synthetic_file_id(job_id: str, kind: str, size: int) -> str:
+    """file_id understood by the fake server: '<job_id>-<video|pdf>-<bytes>'."""
+    return f"{job_id}-{kind}-{size}"
+
+
+def parse_file_id(file_id: str):
+    """'lt000001-video-1048576' -> ('lt000001', 'video', 1048576); bad ids -> size 0"""
+    try:
+        job_id, kind, size = file_id.rsplit("-", 2)
+        return job_id, kind, int(size)
+    except ValueError:
+        return None, None, 0
+
+
+def generate_test_video(path: str, size: int):
+    """
+    Write a real MP4 of roughly `size` bytes (noisy testsrc so the encoder
+    can actually reach the bitrate), then pad it to exactly `size` with a
+    trailing 'free' box, which MP4 readers skip.
+    """
+    bitrate = max(size * 8 // CLIP_SECONDS, 100_000)
+    (
+        ffmpeg
+        .input("testsrc2=size=640x360:rate=25", f="lavfi", t=CLIP_SECONDS)
+        .filter("noise", alls=60, allf="t+u")
+        .output(path, vcodec="mpeg4", video_bitrate=bitrate, qmin=1, pix_fmt="yuv420p")
+        .overwrite_output()
+        .run(quiet=True)
+    )
+
+    pad = size - os.path.getsize(path)
+    if pad >= 8:
+        with open(path, "ab") as f:
+            f.write(struct.pack(">I", pad) + b"free")
+            f.write(bytes(pad - 8))
+
+
+class FakeTelegramServer:
+    """
+    Local stand-in for the Bot API methods the bot/worker use:
+    - getFile / file download: videos are real MP4s (generated once per size
+      with ffmpeg and cached) so the worker's ffmpeg merge really runs;
+      PDFs are served as zero bytes
+    - sendVideo / sendDocument: multipart bodies are streamed, only small
+      fields (caption) are kept and file bytes are counted and discarded
+    - getMe / getUpdates / deleteWebhook so bot/main.py can poll against it
+
+    Knobs:
+    - latency:     seconds added before every API response
+    - bandwidth:   bytes/s per connection for downloads and uploads (0 = unlimited)
+    - retry_after_rate / retry_after: fraction of API calls answered with
+      429 + retry_after (PTB raises telegram.error.RetryAfter)
+
+    The worker never retries, so a job hit by a 429 is recorded in `failed`.
+    A video uploaded with exactly the bytes it was served was sent without
+    the merge (ffmpeg fallback path) and is counted in `ffmpeg_failures`.
+
+    Point Bot at it with TELEGRAM_API_URL=http://<host>:<port>.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8081, latency=0.0, bandwidth=0,
+                 retry_after_rate=0.0, retry_after=1):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.retry_after_rate = retry_after_rate
+        self.retry_after = retry_after
+
+        self.lock = threading.Lock()
+        self.reset()
+
+        # Requests currently being served (downloads/uploads in flight).
+        # Live connections, not per-round stats: reset() must not clear it,
+        # since handler threads from a previous round may still finish later.
+        self.active = 0
+
+        # size -> cached MP4 path
+        self.video_dir = tempfile.mkdtemp(prefix="fake_telegram_")
+        self.videos = {}
+        self.video_lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # ----------------------------------------------------------
+    # STATS
+    # ----------------------------------------------------------
+    def reset(self):
+        with self.lock:
+            self.api_calls = 0
+            self.retry_after_sent = 0
+            self.ffmpeg_failures = 0
+            self.bytes_downloaded = 0
+            self.bytes_uploaded = 0
+            # job_id -> (delivered_at, uploaded bytes)
+            self.deliveries = {}
+            # job_id -> failed_at (dropped by the worker after a 429)
+            self.failed = {}
+            # job_id -> bytes served for a video download
+            self.served = {}
+
+    def add(self, **counters):
+        with self.lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def delivered(self, job_id, size):
+        with self.lock:
+            self.deliveries[job_id] = (time.time(), size)
+            if self.served.get(job_id) == size:
+                self.ffmpeg_failures += 1
+
+    def mark_failed(self, job_id):
+        with self.lock:
+            self.failed.setdefault(job_id, time.time())
+
+    def last_event(self):
+        """Time of the latest delivery or failure (None if nothing yet)."""
+        with self.lock:
+            times = [t for t, _ in self.deliveries.values()] + list(self.failed.values())
+        return max(times, default=None)
+
+    # ----------------------------------------------------------
+    # TEST VIDEOS
+    # ----------------------------------------------------------
+    def video_path(self, size):
+        """Path of a cached MP4 of `size` bytes, or None if ffmpeg is unavailable."""
+        with self.video_lock:
+            if size not in self.videos:
+                path = os.path.join(self.video_dir, f"{size}.mp4")
+                try:
+                    generate_test_video(path, size)
+                except (ffmpeg.Error, OSError) as e:
+                    logging.error(f"Test video generation failed ({size} bytes): {e}")
+                    path = None
+                self.videos[size] = path
+            return self.videos[size]
+
+    def prepare_videos(self, sizes):
+        """Generate test videos up front so generation is not timed."""
+        for size in sorted(set(sizes)):
+            logging.info(f"Preparing {size} byte test video...")
+            self.video_path(size)
+
+    # ----------------------------------------------------------
+    # LIFECYCLE
+    # ----------------------------------------------------------
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        logging.info(f"Fake Telegram API listening on {self.url}")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        shutil.rmtree(self.video_dir, ignore_errors=True)
+
+    # ----------------------------------------------------------
+    # HTTP HANDLER
+    # ----------------------------------------------------------
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            # ---------------- low level I/O ----------------
+            def throttle(self, nbytes):
+                if server.bandwidth > 0:
+                    time.sleep(nbytes / server.bandwidth)
+
+            def iter_body(self):
+                """Yield the request body in chunks (Content-Length or chunked)."""
+                length = self.headers.get("Content-Length")
+                if length is not None:
+                    remaining = int(length)
+                    while remaining > 0:
+                        chunk = self.rfile.read(min(CHUNK, remaining))
+                        if not chunk:
+                            break
+                        remaining -= len(chunk)
+                        self.throttle(len(chunk))
+                        yield chunk
+                    return
+
+                if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                    while True:
+                        size = int(self.rfile.readline().split(b";")[0].strip(), 16)
+                        if size == 0:
+                            self.rfile.readline()
+                            return
+                        chunk = self.rfile.read(size)
+                        self.rfile.readline()
+                        self.throttle(size)
+                        yield chunk
+
+            def parse_multipart(self, boundary):
+                """
+                Stream a multipart body: keep non-file fields, count file bytes.
+                Never holds more than one chunk (+ delimiter) in memory.
+                Returns (params, uploaded_bytes).
+                """
+                delim = b"\r\n--" + boundary.encode()
+                keep = len(delim) + 2
+
+                params, uploaded = {}, 0
+                # Leading CRLF so the first boundary matches `delim` too
+                buf = b"\r\n"
+                state = "preamble"  # preamble -> headers -> body -> headers ... -> done
+                name, is_file, value = None, False, []
+
+                def consume(data):
+                    nonlocal uploaded
+                    if is_file:
+                        uploaded += len(data)
+                    else:
+                        value.append(data)
+
+                for chunk in self.iter_body():
+                    if state == "done":
+                        continue
+                    buf += chunk
+
+                    while True:
+                        if state in ("preamble", "body"):
+                            i = buf.find(delim)
+                            if i < 0:
+                                # Flush all but a possible partial delimiter
+                                if len(buf) > keep:
+                                    if state == "body":
+                                        consume(buf[:-keep])
+                                    buf = buf[-keep:]
+                                break
+                            if state == "body":
+                                consume(buf[:i])
+                                if not is_file:
+                                    params[name] = b"".join(value).decode("utf-8", "replace")
+                            buf = buf[i + len(delim):]
+                            state = "after_delim"
+
+                        if state == "after_delim":
+                            if len(buf) < 2:
+                                break
+                            if buf[:2] == b"--":
+                                state = "done"
+                                break
+                            buf = buf[2:]  # CRLF
+                            state = "headers"
+
+                        if state == "headers":
+                            i = buf.find(b"\r\n\r\n")
+                            if i < 0:
+                                break
+                            headers = buf[:i].decode("utf-8", "replace")
+                            buf = buf[i + 4:]
+
+                            disposition = ""
+                            for line in headers.split("\r\n"):
+                                if line.lower().startswith("content-disposition:"):
+                                    disposition = line
+                            match = re.search(r'\bname="([^"]*)"', disposition)
+                            name = match.group(1) if match else ""
+                            is_file = "filename=" in disposition
+                            value = []
+                            state = "body"
+
+                return params, uploaded
+
+            def parse_params(self):
+                """Return (params, uploaded_bytes) for form, multipart or JSON bodies."""
+                ctype = self.headers.get("Content-Type", "")
+
+                if ctype.startswith("multipart/form-data"):
+                    match = re.search(r'boundary="?([^";]+)"?', ctype)
+                    if match:
+                        return self.parse_multipart(match.group(1))
+
+                body = b"".join(self.iter_body())
+
+                if ctype.startswith("application/json"):
+                    return (json.loads(body) if body else {}), 0
+
+                qs = parse_qs(body.decode("utf-8", "replace"))
+                return {k: v[0] for k, v in qs.items()}, 0
+
+            def send_json(self, code, data):
+                raw = json.dumps(data).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            # ---------------- routing ----------------
+            def do_GET(self):
+                server.add(active=1)
+                try:
+                    if self.path.startswith("/file/bot"):
+                        return self.download()
+                    return self.api()
+                finally:
+                    server.add(active=-1)
+
+            def do_POST(self):
+                server.add(active=1)
+                try:
+                    return self.api()
+                finally:
+                    server.add(active=-1)
+
+            def download(self):
+                # /file/bot<token>/synthetic/<file_id>
+                job_id, kind, size = parse_file_id(self.path.rsplit("/", 1)[-1])
+                path = server.video_path(size) if kind == "video" and size > 0 else None
+                if path:
+                    size = os.path.getsize(path)
+                if kind == "video":
+                    with server.lock:
+                        server.served[job_id] = size
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(size))
+                self.end_headers()
+
+                if path:
+                    with open(path, "rb") as f:
+                        while True:
+                            block = f.read(CHUNK)
+                            if not block:
+                                break
+                            self.wfile.write(block)
+                            self.throttle(len(block))
+                else:
+                    block = bytes(CHUNK)
+                    remaining = size
+                    while remaining > 0:
+                        n = min(CHUNK, remaining)
+                        self.wfile.write(block[:n])
+                        self.throttle(n)
+                        remaining -= n
+
+                server.add(bytes_downloaded=size)
+
+            def api(self):
+                # /bot<token>/<method>
+                method = self.path.split("?", 1)[0].rsplit("/", 1)[-1]
+                params, uploaded = self.parse_params()
+                server.add(api_calls=1)
+
+                if server.latency > 0:
+                    time.sleep(server.latency)
+
+                if method in ("getFile", "sendVideo", "sendDocument") \
+                        and random.random() < server.retry_after_rate:
+                    server.add(retry_after_sent=1)
+                    match = JOB_ID_RE.search(params.get("file_id") or params.get("caption") or "")
+                    if match:
+                        server.mark_failed(match.group(0))
+                    return self.send_json(429, {
+                        "ok": False,
+                        "error_code": 429,
+                        "description": f"Too Many Requests: retry after {server.retry_after}",
+                        "parameters": {"retry_after": server.retry_after},
+                    })
+
+                handler = getattr(self, f"method_{method}", None)
+                if handler is None:
+                    return self.send_json(404, {
+                        "ok": False, "error_code": 404, "description": "Not Found"
+                    })
+                return self.send_json(200, {"ok": True, "result": handler(params, uploaded)})
+
+            # ---------------- Bot API methods ----------------
+            def method_getMe(self, params, uploaded):
+                return {"id": 1, "is_bot": True, "first_name": "FakeBot", "username": "fake_bot"}
+
+            def method_deleteWebhook(self, params, uploaded):
+                return True
+
+            def method_getUpdates(self, params, uploaded):
+                time.sleep(min(float(params.get("timeout", 0) or 0), 5))
+                return []
+
+            def method_getFile(self, params, uploaded):
+                file_id = params.get("file_id", "")
+                return {
+                    "file_id": file_id,
+                    "file_unique_id": file_id,
+                    "file_size": parse_file_id(file_id)[2],
+                    "file_path": f"synthetic/{file_id}",
+                }
+
+            def send_message(self, params, uploaded):
+                server.add(bytes_uploaded=uploaded)
+                match = JOB_ID_RE.search(params.get("caption", ""))
+                if match:
+                    server.delivered(match.group(0), uploaded)
+                return {
+                    "message_id": random.randint(1, 2 ** 31),
+                    "date": int(time.time()),
+                    "chat": {"id": -100, "type": "supergroup"},
+                }
+
+            method_sendVideo = send_message
+            method_sendDocument = send_message
+
+        return Handler
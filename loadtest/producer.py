@@ -0,0 +1,74 @@
+import time
+import random
+
+from core.redis_queue import queue
+from loadtest.fake_telegram import synthetic_file_id
+
+
+def parse_size(text: str) -> int:
+    """'512K' / '20M' / '1G' / '1000' -> bytes"""
+    text = text.strip().upper()
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def parse_mix(text: str):
+    """
+    Size mix like 'video:1M:70,video:20M:25,pdf:2M:5'
+    -> [('video', 1048576, 70.0), ...]  (kind, bytes, weight)
+    """
+    mix = []
+    for item in text.split(","):
+        kind, size, weight = item.split(":")
+        if kind not in ("video", "pdf"):
+            raise ValueError(f"Unknown file type in mix: {kind}")
+        mix.append((kind, parse_size(size), float(weight)))
+    return mix
+
+
+class SyntheticProducer:
+    """
+    Floods RedisQueue with jobs shaped like the ones bot/main.py pushes.
+    Files only exist on the fake Telegram server: the file_id encodes the
+    type and size, and the job id ('lt000042') rides along in the title/caption so
+    the server can match uploads back to jobs.
+    """
+
+    def __init__(self, mix, seed=None):
+        self.mix = mix
+        self.random = random.Random(seed)
+        self.seq = 0
+
+        # job_id -> (enqueued_at, file bytes)
+        self.sent = {}
+
+    def make_job(self):
+        kind, size, _ = self.random.choices(self.mix, weights=[w for _, _, w in self.mix])[0]
+
+        self.seq += 1
+        job_id = f"lt{self.seq:06d}"
+        title = f"Load test {job_id}"
+
+        return job_id, size, {
+            "file_id": synthetic_file_id(job_id, kind, size),
+            "file_type": kind,
+            "raw_caption": title,
+            "title": title,
+            "short_title": title,
+            "safe_filename": f"Load_test_{job_id}.mp4",
+            "owner_id": 0,
+        }
+
+    def produce(self, count: int, rate: float = 0):
+        """
+        Push `count` jobs. rate = jobs/s (0 = as fast as possible).
+        """
+        for _ in range(count):
+            job_id, size, job = self.make_job()
+            self.sent[job_id] = (time.time(), size)
+            queue.push(job)
+
+            if rate > 0:
+                time.sleep(1 / rate)
@@ -0,0 +1,180 @@
+"""
+End-to-end load test: fake Telegram API + synthetic producer + real workers.
+
+    PYTHONPATH=. REDIS_URL=redis://localhost:6379/0 \\
+        python loadtest/run.py --workers 1,2,4 --jobs 100 --mix video:1M:80,pdf:512K:20
+
+Each round clears the queue, starts N `worker/worker.py` processes pointed at
+the fake API (TELEGRAM_API_URL), pushes the jobs and waits until every job is
+delivered or failed (injected 429), or the queue is empty, no request is in
+flight and nothing has happened for --idle-grace seconds.
+Needs the ffmpeg binary: video jobs are served as real MP4s so the worker's
+merge runs; 'ffmpeg fail' counts videos sent on the merge-failure fallback.
+Use a throwaway Redis: the round clears the regular job queue.
+"""
+import os
+import sys
+import math
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import subprocess
+
+from core.redis_queue import queue
+from loadtest.fake_telegram import FakeTelegramServer
+from loadtest.producer import SyntheticProducer, parse_mix, parse_size
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - LOADTEST - %(levelname)s - %(message)s"
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKER_SCRIPT = os.path.join(ROOT, "worker", "worker.py")
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile (values need not be sorted)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[k]
+
+
+def start_workers(count, api_url, workdir, log_file):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = ROOT
+    env["TELEGRAM_API_URL"] = api_url
+    env.setdefault("BOT_TOKEN", "123456:loadtest")
+
+    return [
+        subprocess.Popen(
+            [sys.executable, WORKER_SCRIPT],
+            cwd=workdir, env=env, stdout=log_file, stderr=subprocess.STDOUT,
+        )
+        for _ in range(count)
+    ]
+
+
+def stop_workers(procs):
+    for p in procs:
+        p.terminate()
+    for p in procs:
+        try:
+            p.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            p.kill()
+
+
+def run_round(server, workers, args, log_file):
+    queue.clear()
+    server.reset()
+    producer = SyntheticProducer(args.mix, seed=args.seed)
+
+    workdir = tempfile.mkdtemp(prefix="loadtest_")
+    procs = start_workers(workers, server.url, workdir, log_file)
+    try:
+        time.sleep(args.warmup)  # let workers import + connect before the clock starts
+
+        producer.produce(args.jobs, args.rate)
+        produced_at = time.time()
+
+        deadline = produced_at + args.timeout
+        while time.time() < deadline:
+            if len(server.deliveries) + len(server.failed) >= args.jobs:
+                break
+            # Jobs can also die in the worker without reaching the fake API
+            idle_since = max(server.last_event() or produced_at, produced_at)
+            idle = queue.size() == 0 and server.active <= 0
+            if idle and time.time() - idle_since > args.idle_grace:
+                logging.warning("Queue drained and no progress: ending round early")
+                break
+            time.sleep(0.2)
+    finally:
+        stop_workers(procs)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    latencies = []
+    for job_id, (done_at, _) in server.deliveries.items():
+        if job_id in producer.sent:
+            latencies.append(done_at - producer.sent[job_id][0])
+
+    first = min((t for t, _ in producer.sent.values()), default=time.time())
+    last = max((t for t, _ in server.deliveries.values()), default=first)
+    duration = max(last - first, 1e-9)
+
+    return {
+        "workers": workers,
+        "done": len(latencies),
+        "failed": len(server.failed),
+        "lost": args.jobs - len(latencies) - len(server.failed),
+        "ffmpeg_fail": server.ffmpeg_failures,
+        "jobs_s": len(latencies) / duration,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        "mb_s": (server.bytes_downloaded + server.bytes_uploaded) / duration / 1024 ** 2,
+        "retry_after": server.retry_after_sent,
+    }
+
+
+def print_report(rows):
+    print()
+    print(f"{'workers':>7} {'done':>6} {'429 fail':>8} {'lost':>5} {'ffmpeg fail':>11} "
+          f"{'jobs/s':>8} {'p50 s':>8} {'p99 s':>8} {'MB/s':>8} {'429s':>5}")
+    for r in rows:
+        print(f"{r['workers']:>7} {r['done']:>6} {r['failed']:>8} {r['lost']:>5} {r['ffmpeg_fail']:>11} "
+              f"{r['jobs_s']:>8.2f} {r['p50']:>8.2f} {r['p99']:>8.2f} {r['mb_s']:>8.2f} "
+              f"{r['retry_after']:>5}")
+
+    if any(r["ffmpeg_fail"] for r in rows):
+        print("\nWARNING: some videos skipped the ffmpeg merge; "
+              "video numbers include the failure path.")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Worker load test against a fake Telegram API")
+    ap.add_argument("--workers", default="1,2,4", help="comma separated worker counts, one round each")
+    ap.add_argument("--jobs", type=int, default=50, help="jobs per round")
+    ap.add_argument("--rate", type=float, default=0, help="enqueue rate in jobs/s (0 = burst)")
+    ap.add_argument("--mix", type=parse_mix, default=parse_mix("video:1M:80,video:20M:15,pdf:512K:5"),
+                    help="type:size:weight list, e.g. video:1M:80,pdf:512K:20")
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--latency", type=float, default=0.05, help="fake API latency per call (s)")
+    ap.add_argument("--bandwidth", type=parse_size, default=0,
+                    help="per-connection bandwidth, e.g. 10M (bytes/s, 0 = unlimited)")
+    ap.add_argument("--retry-after-rate", type=float, default=0.0,
+                    help="fraction of getFile/send* calls answered with 429")
+    ap.add_argument("--retry-after", type=int, default=1, help="retry_after seconds in injected 429s")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8081)
+    ap.add_argument("--warmup", type=float, default=3.0)
+    ap.add_argument("--timeout", type=float, default=300.0, help="max seconds to wait per round")
+    ap.add_argument("--idle-grace", type=float, default=30.0,
+                    help="end a round once the queue is empty and nothing happened for this long")
+    ap.add_argument("--worker-log", default=os.devnull, help="file for worker output")
+    args = ap.parse_args()
+
+    server = FakeTelegramServer(
+        host=args.host, port=args.port, latency=args.latency, bandwidth=args.bandwidth,
+        retry_after_rate=args.retry_after_rate, retry_after=args.retry_after,
+    ).start()
+    server.prepare_videos(size for kind, size, _ in args.mix if kind == "video")
+
+    rows = []
+    try:
+        with open(args.worker_log, "ab") as log_file:
+            for workers in (int(w) for w in args.workers.split(",")):
+                logging.info(f"Round: {workers} worker(s), {args.jobs} jobs")
+                rows.append(run_round(server, workers, args, log_file))
+    finally:
+        server.stop()
+        queue.clear()
+
+    print_report(rows)
+
+
+if __name__ == "__main__":
+    main()
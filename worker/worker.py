@@ -7,15 +7,20 @@ from telegram import Bot
 from config.settings import Settings
 from core.redis_queue import queue
 from core.title_processor import title_processor
-from core.thumbnail_generator import thumb
+from core.thumbnail_generator import thumbnailer as thumb
 from core.video_downloader import downloader
+from core.job_profiler import profiler
 
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - WORKER - %(levelname)s - %(message)s"
 )
 
-bot = Bot(token=Settings.TELEGRAM_BOT_TOKEN)
+bot = Bot(
+    token=Settings.TELEGRAM_BOT_TOKEN,
+    base_url=Settings.TELEGRAM_BASE_URL,
+    base_file_url=Settings.TELEGRAM_BASE_FILE_URL,
+)
 
 class Worker:
 
@@ -27,12 +32,15 @@ class Worker:
     def merge_thumbnail_with_video(self, video_path, thumbnail_path, output_path):
         """
         Set custom thumbnail for video using ffmpeg.
+        The image is added as an attached_pic (cover art) stream; MP4 has
+        no support for '-attach' (Matroska only).
         """
         try:
+            video = ffmpeg.input(video_path)
+            cover = ffmpeg.input(thumbnail_path)
             (
                 ffmpeg
-                .input(video_path)
-                .output(output_path, vcodec="copy", acodec="copy", **{'attach': thumbnail_path})
+                .output(video, cover, output_path, c="copy", **{"disposition:v:1": "attached_pic"})
                 .overwrite_output()
                 .run(quiet=True)
             )
@@ -65,7 +73,12 @@ class Worker:
     async def process_job(self, job):
         """
         Process a single job from Redis queue.
+        Each step is timed; sampled/slow jobs are profiled (see JobProfiler).
         """
+        with profiler.job(job) as run:
+            await self._process_job(job, run)
+
+    async def _process_job(self, job, run):
         file_id = job["file_id"]
         file_type = job["file_type"]
         raw_caption = job["raw_caption"]
@@ -79,11 +92,13 @@ class Worker:
 
         # STEP 1: Download file from Telegram
         logging.info(f"Downloading file: {safe_filename}")
-        await self.download_telegram_file(file_id, input_path)
+        with run.step("download"):
+            await self.download_telegram_file(file_id, input_path)
 
         # STEP 2: Generate THUMBNAIL
         logging.info("Generating thumbnail...")
-        thumbnail_path = thumb.generate(short_title, safe_filename.replace(".mp4", ".jpg"))
+        with run.step("thumbnail"):
+            thumbnail_path = thumb.generate_thumbnail(short_title, safe_filename.replace(".mp4", ""))
 
         # STEP 3: Merge thumbnail with video
         output_path = f"final/{safe_filename}"
@@ -91,14 +106,18 @@ class Worker:
 
         if file_type == "video":
             logging.info("Merging thumbnail into video...")
-            self.merge_thumbnail_with_video(input_path, thumbnail_path, output_path)
+            with run.step("ffmpeg"):
+                merged = self.merge_thumbnail_with_video(input_path, thumbnail_path, output_path)
+            if not merged:
+                output_path = input_path  # Send original rather than a missing file
         else:
             output_path = input_path  # PDFs don’t need ffmpeg
 
         # STEP 4: Send to group
         caption_text = f"🎬 {title}"
         logging.info("Sending processed file to Telegram group/topic...")
-        await self.send_to_group(output_path, caption_text, file_type)
+        with run.step("upload"):
+            await self.send_to_group(output_path, caption_text, file_type)
 
         # STEP 5: Cleanup
         try: